@@ -3,23 +3,24 @@ Stage 6: A/B Test Voice Choices
 Interactive CLI for comparing two sets of generated voice files for choices.
 """
 
-import pickle
 import random
-import time
 from enum import Enum
 from pathlib import Path
 
 import readchar
-import rich
 import typer
 from rich.console import Console
 from rich.table import Table
 from sqlite_utils import Database
 
 # Reuse SoundPlayer and context printing from annotate
-from princess.annotate import SoundPlayer, print_choice_context, load_choices
-from princess.models import ChoiceResult
-from princess.text import strip_formatting
+from princess.annotate import (
+    SoundPlayer,
+    load_choices,
+    open_db,
+    print_choice_context,
+    warm_up_characters,
+)
 
 app = typer.Typer(pretty_exceptions_show_locals=False)
 console = Console()
@@ -29,8 +30,6 @@ sound_player = SoundPlayer()
 
 # --- Database Setup ---
 
-DB_PATH = Path("output/annotations.db")
-
 
 class Preference(str, Enum):
     SET_A = "A"
@@ -41,7 +40,7 @@ class Preference(str, Enum):
 
 def setup_ab_db() -> Database:
     """Set up the SQLite database and ensure the ab_results table exists."""
-    db = Database(DB_PATH)
+    db = open_db()
 
     table_name = "ab_results"
     if table_name not in db.table_names():
@@ -107,8 +106,18 @@ def save_ab_result(db: Database, filename: str, preference: Preference, notes: s
 
 def get_ab_preference(db: Database, filename: str) -> Preference:
     """Get the current A/B preference status for a filename."""
-    row = db["ab_results"].get(filename)
-    return Preference(row["preference"]) if row else Preference.PENDING
+    row = db.execute(
+        "SELECT preference FROM ab_results WHERE filename = ?", [filename]
+    ).fetchone()
+    return Preference(row[0]) if row else Preference.PENDING
+
+
+def get_decided_filenames(db: Database) -> set[str]:
+    """Get all filenames with a non-pending A/B preference in a single query."""
+    rows = db.query(
+        "SELECT filename FROM ab_results WHERE preference != ?", [Preference.PENDING.value]
+    )
+    return {row["filename"] for row in rows}
 
 
 # --- Stats Display ---
@@ -255,6 +264,7 @@ def run_ab_test(
     """
     # Initialize sound player thread
     sound_player.start()
+    characters_scan = warm_up_characters()
 
     try:
         db = setup_ab_db()
@@ -265,11 +275,10 @@ def run_ab_test(
         # Filter choices
         all_choices = [c for c in choices_data.choices if c.output] # Only choices with expected output
         if pending_only:
-            filtered_choices = [
-                choice for choice in all_choices
-                if get_ab_preference(db, choice.output.name) == Preference.PENDING
+            decided = get_decided_filenames(db)
+            working_choices = [
+                choice for choice in all_choices if choice.output.name not in decided
             ]
-            working_choices = filtered_choices
         else:
             working_choices = all_choices
 
@@ -284,6 +293,7 @@ def run_ab_test(
             return
 
         console.print(f"[green]Loaded {len(working_choices)} choices for A/B testing.[/]")
+        characters_scan.join()
 
         # A/B Test Loop
         for i, choice in enumerate(working_choices):
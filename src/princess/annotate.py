@@ -3,23 +3,22 @@ Stage 5: Annotate audio files
 Interactive CLI for annotating the choice audio files generated in the pipeline.
 """
 
+import os
 import pickle
 from enum import Enum
+from functools import cache
 from pathlib import Path
-import subprocess
 import time
-import audiofile
-import numpy as np
-import sounddevice
 import typer
 from rich.console import Console
 from rich.table import Table
 from sqlite_utils import Database
-import pygame
 import threading
 import readchar
 import queue
+from concurrent.futures import ThreadPoolExecutor
 
+from princess.characters import extract_characters
 from princess.game import get_game_path
 from princess.models import Dialogue
 from princess.text import print_choice_context, strip_formatting
@@ -28,8 +27,13 @@ from princess.voice import generate_choice_audio
 app = typer.Typer()
 console = Console()
 
-pygame.init()
-pygame.mixer.init()
+
+def read_audio(file_path):
+    # audiofile and sounddevice (which loads PortAudio) are imported on first use,
+    # so the cli and --help start without the audio stack
+    import audiofile
+
+    return audiofile.read(file_path, always_2d=True)
 
 
 class SoundPlayer:
@@ -43,6 +47,11 @@ class SoundPlayer:
         self.is_playing = False
         self.stop_requested = False
         self.thread = None
+        # bumped on clear() so the player thread can discard files queued before it
+        self.generation = 0
+        # files decoded ahead of time, see prefetch()
+        self.decoder = ThreadPoolExecutor(max_workers=1)
+        self.prefetched = {}
 
     def start(self):
         """Start the player thread if not already running."""
@@ -54,46 +63,80 @@ class SoundPlayer:
 
     def _player_thread(self):
         """Background thread that plays audio files from the playlist."""
+        import sounddevice
+
         while not self.stop_requested:
             try:
-                # Get the next file from the playlist if one is available
-                try:
-                    self.current_file = self.playlist.get(block=False)
-                    self.is_playing = True
-
-                    # Play the file
-                    pygame.mixer.music.load(self.current_file)
-                    pygame.mixer.music.play()
+                # Block until the next file arrives, None is the shutdown sentinel
+                item = self.playlist.get()
+                if item is None:
+                    self.playlist.task_done()
+                    break
 
-                    # Wait for playback to complete or stop request
-                    while pygame.mixer.music.get_busy() and not self.stop_requested:
-                        time.sleep(0.1)
+                generation, self.current_file = item
+                if generation != self.generation:
+                    # Queued before the last clear, drop it
+                    self.playlist.task_done()
+                    continue
 
-                    self.is_playing = False
+                # Decode and play the file in-process
+                signal, sample_rate = self._decode(self.current_file)
+                if generation != self.generation:
+                    # Cleared while we were decoding
                     self.playlist.task_done()
+                    continue
+
+                self.is_playing = True
+                sounddevice.play(signal.T, sample_rate)
+                if generation != self.generation:
+                    # Cleared right as playback started, make sure it doesn't keep going
+                    sounddevice.stop()
 
-                except queue.Empty:
-                    # No files in playlist, sleep briefly and check again
-                    time.sleep(0.2)
+                # Block until playback completes, stop() wakes this up early
+                sounddevice.wait()
+
+                if generation == self.generation:
+                    self.is_playing = False
+                self.playlist.task_done()
 
             except Exception as e:
                 console.print(f"[red]Error in player thread: {e}[/]")
                 self.is_playing = False
                 time.sleep(0.5)  # Prevent busy-looping on error
 
+    def _decode(self, file_path):
+        """Decode a file, reusing the result of an earlier prefetch if there is one."""
+        if future := self.prefetched.pop(file_path, None):
+            try:
+                return future.result()
+            except (OSError, RuntimeError) as e:
+                # audiofile raises these for missing or undecodable files, retry once in the foreground
+                console.print(f"[yellow]Prefetch failed for {file_path}: {e}[/]")
+        return read_audio(file_path)
+
+    def prefetch(self, file_path):
+        """Decode a file in the background so it starts instantly when it's queued later."""
+        if file_path in self.prefetched or not Path(file_path).exists():
+            return
+        # only keep a few files around, older prefetches were likely skipped
+        while len(self.prefetched) >= 4:
+            self.prefetched.pop(next(iter(self.prefetched)), None)
+        self.prefetched[file_path] = self.decoder.submit(read_audio, file_path)
+
     def queue(self, file_path):
         """Add a file to the playlist."""
-        self.playlist.put(file_path)
+        self.playlist.put((self.generation, file_path))
         self.start()  # Ensure the player thread is running
 
     def queue_multiple(self, file_paths):
         """Add multiple files to the playlist."""
         for path in file_paths:
-            self.playlist.put(path)
+            self.playlist.put((self.generation, path))
         self.start()  # Ensure the player thread is running
 
     def clear(self):
         """Clear the playlist and stop current playback."""
+        self.generation += 1
         self.stop()
         # Clear the queue
         while not self.playlist.empty():
@@ -106,7 +149,9 @@ class SoundPlayer:
     def stop(self):
         """Stop the current playback but keep the thread alive."""
         if self.is_playing:
-            pygame.mixer.music.stop()
+            import sounddevice
+
+            sounddevice.stop()
             self.is_playing = False
 
     def shutdown(self):
@@ -114,6 +159,8 @@ class SoundPlayer:
         self.stop_requested = True
         self.stop()
         if self.thread and self.thread.is_alive():
+            # Wake the thread if it's waiting on an empty playlist
+            self.playlist.put(None)
             self.thread.join(timeout=1.0)
 
 
@@ -128,10 +175,21 @@ class AnnotationStatus(str, Enum):
     PENDING = "pending"
 
 
+def open_db(db_path=Path("output/annotations.db")):
+    """
+    Open the annotations database.
+    WAL with synchronous=NORMAL avoids an fsync on every commit, which the interactive tools
+    do after nearly every keypress.
+    """
+    db = Database(db_path)
+    db.enable_wal()
+    db.execute("PRAGMA synchronous = NORMAL")
+    return db
+
+
 def setup_db():
     """Set up the SQLite database for annotations using sqlite-utils."""
-    db_path = Path("output/annotations.db")
-    db = Database(db_path)
+    db = open_db()
 
     # Create table if it doesn't exist
     if "annotations" not in db.table_names():
@@ -257,6 +315,42 @@ def display_annotation_progress(db):
     console.print(table)
 
 
+def warm_up_characters():
+    """
+    Scan the game scripts for character names in a background thread.
+    The scan walks the whole game tree, so we overlap it with database setup instead of
+    stalling on the first context print.
+    """
+    thread = threading.Thread(target=extract_characters, daemon=True)
+    thread.start()
+    return thread
+
+
+def list_directory(directory):
+    """List the entry names in a directory, a missing directory counts as empty."""
+    try:
+        with os.scandir(directory) as entries:
+            return frozenset(entry.name for entry in entries)
+    except FileNotFoundError:
+        return frozenset()
+
+
+@cache
+def list_game_directory(directory):
+    """List a game directory once per session, the game files don't change while we run."""
+    return list_directory(directory)
+
+
+def find_existing_files(paths):
+    """Return the subset of paths that exist, listing each parent directory once."""
+    paths = {Path(path) for path in paths}
+    # output files come and go during a session, so these listings aren't cached
+    listings = {
+        directory: list_directory(directory) for directory in {path.parent for path in paths}
+    }
+    return {path for path in paths if path.name in listings[path.parent]}
+
+
 def play_audio(audio_path, block=False):
     """
     Play audio using the global sound player.
@@ -266,11 +360,27 @@ def play_audio(audio_path, block=False):
     sound_player.queue(audio_path)
 
 
+def resolve_voice_paths(dialogues):
+    """
+    Resolve the game voice files for a batch of context lines, keyed by script line.
+    Lines whose voice file is missing from the game directory are left out.
+    """
+    game_path = get_game_path()
+    voice_paths = {}
+    for dialogue in dialogues:
+        if not isinstance(dialogue, Dialogue) or not dialogue.voice:
+            continue
+        voice_path = game_path / dialogue.voice
+        if voice_path.name in list_game_directory(voice_path.parent):
+            voice_paths[dialogue.line] = voice_path
+    return voice_paths
+
+
 def play_context_and_choice(choice, previous_count=1):
     """Play previous context and the choice back to back."""
     # Get the previous dialogues based on the requested count
     prev_dialogues = choice.previous_dialogues[-previous_count:] if previous_count > 0 else []
-    game_path = get_game_path()
+    voice_paths = resolve_voice_paths(prev_dialogues + choice.subsequent_dialogues[:1])
 
     # Clear any current playlist
     sound_player.clear()
@@ -297,8 +407,7 @@ def play_context_and_choice(choice, previous_count=1):
             console.print(f"[dim]{text}[/]")
 
             # Add to playlist if voice file is available
-            if dialogue.voice:
-                voice_path = game_path / dialogue.voice
+            if voice_path := voice_paths.get(dialogue.line):
                 playlist.append(voice_path)
             else:
                 console.print("[yellow]No voice file for this dialogue[/]")
@@ -319,8 +428,7 @@ def play_context_and_choice(choice, previous_count=1):
         console.print(f"[dim]{text}[/]")
 
         # Add to playlist if voice file is available
-        if next_dialogue.voice:
-            voice_path = game_path / next_dialogue.voice
+        if voice_path := voice_paths.get(next_dialogue.line):
             playlist.append(voice_path)
         else:
             console.print("[yellow]No voice file for this dialogue[/]")
@@ -331,7 +439,8 @@ def play_context_and_choice(choice, previous_count=1):
 
 def play_choice_and_next(choice, play_count=1):
     """Play the choice and the next dialogue if available."""
-    game_path = get_game_path()
+    next_dialogues = choice.subsequent_dialogues[:play_count]
+    voice_paths = resolve_voice_paths(next_dialogues)
 
     # Clear any current playlist
     sound_player.clear()
@@ -344,14 +453,13 @@ def play_choice_and_next(choice, play_count=1):
     playlist.append(choice.output)
 
     # Add the next dialogue to playlist if available
-    for line in choice.subsequent_dialogues[:play_count]:
+    for line in next_dialogues:
         console.print(f"[dim cyan]Next dialogue:[/]")
         text = f"{line.character}: {strip_formatting(line.dialogue)}"
         console.print(f"[dim]{text}[/]")
 
         # Add to playlist if voice file is available
-        if line.voice:
-            voice_path = game_path / line.voice
+        if voice_path := voice_paths.get(line.line):
             playlist.append(voice_path)
         else:
             console.print("[yellow]No voice file for this dialogue[/]")
@@ -369,8 +477,17 @@ def save_annotation(db, filename, status, notes=None):
 
 def get_annotation_status(db, filename):
     """Get the current annotation status for a filename using sqlite-utils."""
-    row = db["annotations"].get(filename)
-    return row["status"] if row else AnnotationStatus.PENDING
+    # plain sqlite3 query with a fixed string so the connection's statement cache reuses it
+    row = db.execute("SELECT status FROM annotations WHERE filename = ?", [filename]).fetchone()
+    return row[0] if row else AnnotationStatus.PENDING
+
+
+def get_annotated_filenames(db):
+    """Get all filenames with a non-pending status in a single query."""
+    rows = db.query(
+        "SELECT filename FROM annotations WHERE status != ?", [AnnotationStatus.PENDING.value]
+    )
+    return {row["filename"] for row in rows}
 
 
 def regenerate_audio(choice):
@@ -498,6 +615,7 @@ def annotate(
     """
     # Initialize the sound player
     sound_player.start()
+    characters_scan = warm_up_characters()
 
     try:
         # Load data and setup database
@@ -510,15 +628,10 @@ def annotate(
         # Filter choices based on options
         all_choices = choices.choices
         if pending_only:
-            filtered_choices = []
-            for choice in all_choices:
-                if not choice.output:
-                    continue
-                filename = choice.output.name
-                status = get_annotation_status(db, filename)
-                if status == AnnotationStatus.PENDING:
-                    filtered_choices.append(choice)
-            working_choices = filtered_choices
+            annotated = get_annotated_filenames(db)
+            working_choices = [
+                c for c in all_choices if c.output and c.output.name not in annotated
+            ]
         else:
             working_choices = [c for c in all_choices if c.output]
 
@@ -533,6 +646,10 @@ def annotate(
             return
 
         console.print(f"[green]Loaded {len(working_choices)} choices for annotation.[/]")
+        characters_scan.join()
+
+        # Check all audio files up front with one directory listing
+        audio_files = find_existing_files(c.output for c in working_choices if c.output)
 
         # Annotation loop
         for i, choice in enumerate(working_choices):
@@ -542,7 +659,7 @@ def annotate(
                 )
                 continue
 
-            if not choice.output.exists():
+            if choice.output not in audio_files:
                 console.print(f"[yellow]Audio file missing for choice {i + start_index}[/]")
                 console.print("[cyan]Generating audio file automatically...[/]")
                 generate_choice_audio(choice, force=True)
@@ -565,6 +682,10 @@ def annotate(
             sound_player.clear()
             play_audio(choice.output)
 
+            # Decode the next choice while this one is being judged
+            if i + 1 < len(working_choices):
+                sound_player.prefetch(working_choices[i + 1].output)
+
             # Run the main command loop for this choice
             run_command_loop(db, filename, choice)
 
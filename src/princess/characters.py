@@ -1,6 +1,5 @@
 import re
 from functools import cache
-from pathlib import Path
 
 import rich
 import typer
@@ -11,7 +10,7 @@ from princess.game import walk_script_files
 app = typer.Typer()
 
 
-CHARACTER_RE = re.compile(r'^define (?P<id>.*?) = Character\(_?\(?"(?P<name>[^"]*)"\)?')
+CHARACTER_RE = re.compile(r'\s*define (?P<id>\S+) = Character\(_?\(?"(?P<name>[^"]*)"\)?')
 
 
 class Character(BaseModel):
@@ -28,9 +27,10 @@ class Character(BaseModel):
 def extract_characters(game_path=None):
     def extract_inner():
         for path in walk_script_files(game_path):
-            for line in Path(path).read_text().splitlines():
-                if match := CHARACTER_RE.search(line.lstrip()):
-                    yield Character(**match.groupdict())
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if match := CHARACTER_RE.match(line):
+                        yield Character(**match.groupdict())
 
     return {c.id: c for c in extract_inner()}
 
@@ -4,6 +4,8 @@ We extract choices and their surrounding dialogue by traversing the Script tree.
 The resulting list can be used for text-to-speech generation.
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
 from hashlib import sha256
 from pathlib import Path
 from typing import Iterator
@@ -28,29 +30,32 @@ from princess.parser import parse_script
 from princess.text import clean_choice_for_voice
 
 app = typer.Typer()
+VOICE_OUTPUT_DIR = Path("output/voice")
 
 
+@cache
 def get_voice_output_path(choice: str) -> Path:
-    return Path("output/voice") / f"{sha256(choice.encode()).hexdigest()}.flac"
+    return VOICE_OUTPUT_DIR / f"{sha256(choice.encode()).hexdigest()}.flac"
 
 
 def extract_choices(script: Script, script_path: str | None = None) -> list[ChoiceResult]:
     results: list[ChoiceResult] = []
+    script_path = str(script_path)
 
-    def walk(node, path: list[Dialogue | Choice], current_label: str | None):
-        """
-        'path' is a list of items (Dialogue, Choice, etc.) that led us here.
-        'current_label' is the active label name.
-        """
+    # depth-first walk with an explicit stack of (node, path, current_label).
+    # 'path' is a list of items (Dialogue, Choice, etc.) that led us here, siblings share it
+    # so dialogue seen in one branch stays visible to the nodes that follow it.
+    # children are pushed in reverse so they pop in script order.
+    stack: list[tuple[object, list[Dialogue | Choice], str | None]] = [(script, [], None)]
+    while stack:
+        node, path, current_label = stack.pop()
 
         match node:
             case Script() | Menu() | Condition():
-                for child in node.children:
-                    walk(child, path, current_label)
+                stack.extend((child, path, current_label) for child in reversed(node.children))
 
             case Label(label=new_label):
-                for child in node.children:
-                    walk(child, path, new_label)
+                stack.extend((child, path, new_label) for child in reversed(node.children))
 
             case Dialogue():
                 path.append(node)
@@ -64,9 +69,10 @@ def extract_choices(script: Script, script_path: str | None = None) -> list[Choi
                     choice=choice_text,
                     condition=cond,
                     label=current_label,
-                    previous_dialogues=path[:],
+                    # validation copies the list, so later appends to path don't leak in
+                    previous_dialogues=path,
                     subsequent_dialogues=subs,
-                    path=str(script_path),
+                    path=script_path,
                     line=ln,
                     clean=clean_choice_for_voice(choice_text),
                     output=get_voice_output_path(choice_text),
@@ -75,13 +81,11 @@ def extract_choices(script: Script, script_path: str | None = None) -> list[Choi
 
                 # Step C: For nested blocks, we append the current choice to the path
                 chosen = Choice(line=ln, choice=choice_text, condition=cond)
-                new_path = path[:] + [chosen]
+                new_path = [*path, chosen]
 
                 # Now walk deeper (unless next is a junction)
-                for child in cc:
-                    walk(child, new_path, current_label)
+                stack.extend((child, new_path, current_label) for child in reversed(cc))
 
-    walk(script, [], None)
     return results
 
 
@@ -113,15 +117,20 @@ def extract_choices_from_script(path: Path):
     return choices
 
 
+def extract_choices_from_file(path: Path) -> list[ChoiceResult]:
+    return extract_choices(parse_script(path), script_path=path)
+
+
 @app.command("all-choices")
 def extract_all_choices():
     extracted = ChoiceResultList(choices=[])
     game_scripts = list(walk_script_files())
-    for path in track(game_scripts):
-        script = parse_script(path)
-        choices = extract_choices(script, script_path=path)
-        rich.print(f"{path}: Extracted {len(choices)} choices")
-        extracted.choices.extend(choices)
+    # parsing is cpu-bound and independent per script, so spread it across processes
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(extract_choices_from_file, game_scripts, chunksize=4)
+        for path, choices in zip(game_scripts, track(results, total=len(game_scripts))):
+            rich.print(f"{path}: Extracted {len(choices)} choices")
+            extracted.choices.extend(choices)
 
     rich.print(f"Extracted {len(extracted.choices)} choices from {len(game_scripts)} scripts")
     return extracted
@@ -1,7 +1,9 @@
 import os
+from functools import cache
 from pathlib import Path
 
 
+@cache
 def get_game_path():
     return Path(os.environ["GAME_PATH"])
 
@@ -10,4 +12,21 @@ def walk_script_files(game_path=None):
     if game_path is None:
         game_path = get_game_path()
 
-    yield from game_path.rglob("*.rpy")
+    return list_script_files(Path(game_path))
+
+
+@cache
+def list_script_files(game_path: Path) -> tuple[Path, ...]:
+    # the game tree doesn't change during a run, so walk it once and share the result.
+    # scandir avoids building a Path and running fnmatch for every entry in the tree.
+    scripts = []
+    stack = [game_path]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".rpy"):
+                    scripts.append(Path(entry.path))
+    # directory order depends on the filesystem, sort so every consumer sees the same order
+    return tuple(sorted(scripts))
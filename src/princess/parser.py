@@ -5,9 +5,18 @@ RenPy script parsing pipeline. We don't use any grammar and instead work our way
 """
 
 import itertools
+import os
+import pickle
 import re
+import shutil
+import sys
+from contextlib import suppress
+from functools import cache
+from hashlib import sha256
 from pathlib import Path
 
+import lark
+import pydantic
 import rich
 import typer
 from lark import Discard, Token, Transformer, Tree
@@ -26,15 +35,37 @@ label_re = re.compile(r"^\s*label (?P<label>\w+):$")
 menu_re = re.compile(r"^\s*menu\s*(?P<n>\w+)?:$")
 jump_re = re.compile(r"^\s*jump (?P<dest>\w+)$")
 voice_re = re.compile(r"^\s*voice \"(?P<voice>[^\"]+)\"$")
+# longest names first, so "spright" is tried before "sp" instead of after a failed match
+character_alternation = "|".join(map(re.escape, sorted(CHARACTERS, key=len, reverse=True)))
 dialogue_re = re.compile(
-    r"^\s*(?P<character>" + "|".join(CHARACTERS) + r') "(?P<dialogue>[^"]+)"( id .*)?$'
+    r"^\s*(?P<character>" + character_alternation + r') "(?P<dialogue>[^"]+)"( id .*)?$'
 )
 choice_re = re.compile(r'^\s*"(?P<choice>[^"]+)"(?:\s*if (?P<condition>.+))?\s*:$')
 condition_re = re.compile(r"^\s*(?P<kind>if|elif|else)\s*(?P<condition>.*):$")
 
+# all line patterns in one alternation, tried in this order, so a line is scanned once.
+# inner group names are dropped since they repeat across patterns.
+token_res = {
+    "LABEL": label_re,
+    "MENU": menu_re,
+    "JUMP": jump_re,
+    "VOICE": voice_re,
+    "DIALOGUE": dialogue_re,
+    "CHOICE": choice_re,
+    "CONDITION": condition_re,
+}
+group_name_re = re.compile(r"\(\?P<\w+>")
+token_re = re.compile(
+    "|".join(
+        f"(?P<{token}>{group_name_re.sub('(?:', regex.pattern)})"
+        for token, regex in token_res.items()
+    )
+)
+
 
 def is_empty(line: str) -> bool:
-    return not line.strip() or line.strip().startswith("#")
+    strip = line.strip()
+    return not strip or strip[0] == "#"
 
 
 def is_block_start(line: str) -> bool:
@@ -42,22 +73,11 @@ def is_block_start(line: str) -> bool:
 
 
 def line_token(line: str, header: bool = False) -> str:
-    if label_re.search(line):
-        return "LABEL"
-    elif menu_re.search(line):
-        return "MENU"
-    elif jump_re.search(line):
-        return "JUMP"
-    elif voice_re.search(line):
-        return "VOICE"
-    elif dialogue_re.search(line):
-        return "DIALOGUE"
-    elif choice_re.search(line):
-        return "CHOICE"
-    elif condition_re.search(line):
-        return "CONDITION"
-    else:
-        return "HEADER" if header else "LINE"
+    # every token starts with a keyword, a character name or a quote, skip the regex otherwise
+    head = line.lstrip()[:1]
+    if (head == '"' or head.isalpha()) and (match := token_re.match(line)):
+        return match.lastgroup
+    return "HEADER" if header else "LINE"
 
 
 def build_script_tree(script: str) -> Tree:
@@ -69,9 +89,9 @@ def build_script_tree(script: str) -> Tree:
     stack = [root]
     lines = script.splitlines()
     for lineno, line in enumerate(lines, start=1):
-        if is_empty(line):
-            continue
         strip = line.strip()
+        if is_empty(strip):
+            continue
         indent = len(line) - len(line.lstrip())
         meta = Meta(line=lineno, indent=indent)
 
@@ -101,6 +121,11 @@ Remove lines that weren't assigned a token, empty blocks. Merge voice and dialog
 """
 
 
+def intern_condition(condition: str | None) -> str | None:
+    # the same flags are tested all over the game, keep one string per condition
+    return condition if condition is None else sys.intern(condition)
+
+
 class RenpyTransformer(Transformer):
     def body(self, children):
         result = []
@@ -112,12 +137,14 @@ class RenpyTransformer(Transformer):
             match node, succ:
                 case Token("VOICE", voice_str), Token("DIALOGUE", dialogue_str):
                     voice_search = voice_re.search(voice_str)
-                    dialogue_search = dialogue_re.search(dialogue_str)
+                    dialogue_fields = dialogue_re.search(dialogue_str).groupdict()
+                    # a few dozen character ids repeat on every line, share one string per id
+                    dialogue_fields["character"] = sys.intern(dialogue_fields["character"])
                     result.append(
                         Dialogue(
                             line=succ.line,
                             **voice_search.groupdict(),
-                            **dialogue_search.groupdict(),
+                            **dialogue_fields,
                         )
                     )
                     skip = True
@@ -142,22 +169,27 @@ class RenpyTransformer(Transformer):
 
         match header:
             case Token("LABEL"):
+                label = label_re.search(header.value)["label"]
                 return Label(
-                    **label_re.search(header.value).groupdict(),
+                    label=sys.intern(label),
                     children=body.children,
                     line=header.line,
                 )
             case Token("MENU"):
                 return Menu(children=body.children, line=header.line)
             case Token("CHOICE"):
+                choice, condition = choice_re.search(header.value).group("choice", "condition")
                 return Choice(
-                    **choice_re.search(header.value).groupdict(),
+                    choice=choice,
+                    condition=intern_condition(condition),
                     children=body.children,
                     line=header.line,
                 )
             case Token("CONDITION"):
+                kind, condition = condition_re.search(header.value).group("kind", "condition")
                 return Condition(
-                    **condition_re.search(header.value).groupdict(),
+                    kind=kind,
+                    condition=intern_condition(condition),
                     children=body.children,
                     line=header.line,
                 )
@@ -176,10 +208,71 @@ class RenpyTransformer(Transformer):
         return Script(children=items)
 
 
-def parse_script(path: Path) -> Tree:
-    script = path.read_text()
-    tree = build_script_tree(script)
-    return RenpyTransformer().transform(tree)
+# the transformer keeps no state between runs, so one instance serves every script
+renpy_transformer = RenpyTransformer()
+
+
+PARSE_CACHE_DIR = Path("output/cache/ast")
+
+
+@cache
+def parser_fingerprint() -> str:
+    # parsed trees depend on the patterns, the transformer, the models and the libraries that
+    # pickle them, invalidate on any change
+    package = Path(__file__).parent
+    digest = sha256()
+    for name in ["parser.py", "models.py", "constants.py"]:
+        digest.update((package / name).read_bytes())
+    digest.update(f"{sys.version}:{lark.__version__}:{pydantic.VERSION}".encode())
+    return digest.hexdigest()[:16]
+
+
+@cache
+def parse_cache_dir() -> Path:
+    # entries from other parser versions can never be hit again, drop them once per process
+    if PARSE_CACHE_DIR.is_dir():
+        for stale in PARSE_CACHE_DIR.iterdir():
+            if stale.name != parser_fingerprint():
+                shutil.rmtree(stale, ignore_errors=True)
+    return PARSE_CACHE_DIR / parser_fingerprint()
+
+
+def parse_source(source: str) -> Script:
+    tree = build_script_tree(source)
+    return renpy_transformer.transform(tree)
+
+
+def parse_script(path: Path, use_cache: bool = True) -> Script:
+    """
+    Parse a script file. Results are cached on disk by content, the cache is best-effort and
+    any failure to read or write it falls back to a regular parse.
+    """
+    source = path.read_bytes()
+    if not use_cache:
+        return parse_source(source.decode())
+
+    cache_path = None
+    try:
+        cache_path = parse_cache_dir() / f"{sha256(source).hexdigest()}.pickle"
+        return pickle.loads(cache_path.read_bytes())
+    except (OSError, EOFError, ValueError, AttributeError, ImportError, pickle.UnpicklingError):
+        # missing, unreadable or truncated entry, it gets written below
+        pass
+
+    script = parse_source(source.decode())
+    if cache_path is None:
+        return script
+
+    # write to a temporary name first, scripts are parsed in parallel by several processes
+    temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path.write_bytes(pickle.dumps(script))
+        temp_path.replace(cache_path)
+    except (OSError, pickle.PicklingError):
+        with suppress(OSError):
+            temp_path.unlink(missing_ok=True)
+    return script
 
 
 @app.command("parse")
@@ -1,13 +1,13 @@
 import pickle
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import rich
 import typer
 from rich.progress import track
 
-from princess.choices import ChoiceResultList, extract_choices
+from princess.choices import VOICE_OUTPUT_DIR, ChoiceResultList, extract_choices_from_file
 from princess.game import walk_script_files
-from princess.parser import parse_script
 from princess.voice import generate_choice_audio
 
 app = typer.Typer()
@@ -15,22 +15,31 @@ app = typer.Typer()
 
 @app.command("run")
 def run_pipeline():
+    existing_files = set(VOICE_OUTPUT_DIR.glob("*.flac"))
+
     # extract spoken choices
     choices = ChoiceResultList()
-    seen = set()
-    for path in walk_script_files():
-        script = parse_script(path)
-        for choice in extract_choices(script, script_path=path):
-            if choice.clean and choice.clean not in seen:
-                seen.add(choice.clean)
-                choices.choices.append(choice)
+    kept = {}  # clean text -> index in choices
+    with ProcessPoolExecutor() as executor:
+        for extracted in executor.map(extract_choices_from_file, walk_script_files(), chunksize=4):
+            for choice in extracted:
+                if not choice.clean:
+                    continue
+                if choice.clean not in kept:
+                    kept[choice.clean] = len(choices.choices)
+                    choices.choices.append(choice)
+                elif (
+                    choice.output in existing_files
+                    and choices.choices[kept[choice.clean]].output not in existing_files
+                ):
+                    # the same line can come from several scripts with different raw text, keep
+                    # the one already generated so walk order never renames or orphans audio
+                    choices.choices[kept[choice.clean]] = choice
 
     rich.print(f"extracted {len(choices.choices)} spoken choices")
     Path("output/choices.pickle").write_bytes(pickle.dumps(choices))
 
     # check existing audio files
-    base_dir = choices.choices[0].output.parent
-    existing_files = set(base_dir.glob("*.flac"))
     expected_files = {choice.output for choice in choices.choices}
 
     unexpected_files = existing_files - expected_files
@@ -46,7 +55,9 @@ def run_pipeline():
         for file in unexpected_files:
             file.unlink()
 
-    missing_choices = {choice.output: choice for choice in choices.choices}
+    missing_choices = {
+        choice.output: choice for choice in choices.choices if choice.output in missing_files
+    }
 
     if missing_choices and typer.confirm("generate missing files?"):
         for choice in track(missing_choices.values()):
@@ -1,6 +1,8 @@
 import re
+from functools import cache
 
 import rich
+from rich.console import Group
 
 from princess.characters import extract_characters
 from princess.models import Dialogue, Choice, ChoiceResult
@@ -9,14 +11,26 @@ rewrites = {
     "N-no. I w-won't t-tell you.": "No, I won't tell you.",
 }
 
+bullet_re = re.compile(r"•\s+")
+formatting_re = re.compile(r"\{[^\}]+\}")
+# (prefix) labels and [[action]] markers, removed together in one pass
+markup_re = re.compile(r"\([^\)]+\)\s+|\[\[[^]]+\]")
+quoted_text_re = re.compile(r"''(.+?)''")
+strip_parens = str.maketrans("", "", "()")
+quotes_re = re.compile(r"(?<!\w)'|'(?!\w)|^'|'$")
+special_re = re.compile(
+    r"^(Say|Join|Follow|Play|Return|Make|Continue|Ignore|Embrace|Investigate|Go|Do|Drop|Tighten|Kneel|Force|Try)\s"
+)
+
 
 def strip_formatting(text: str):
-    text = re.sub(r"\{[^}]+\}", "", text)
+    text = formatting_re.sub("", text)
     text = text.replace("''", '"')
     text = text.replace("\\n", "")
     return text
 
 
+@cache
 def clean_choice_for_voice(choice: str) -> str | None:
     """
     Clean menu choice text for text-to-speech processing.
@@ -27,22 +41,10 @@ def clean_choice_for_voice(choice: str) -> str | None:
     Returns:
         Cleaned text suitable for TTS, or None if not applicable
     """
-    bullet_re = re.compile(r"•\s+")
-    formatting_re = re.compile(r"\{[^\}]+\}")
-    prefixes_re = re.compile(r"\([^\)]+\)\s+")
-    actions_re = re.compile(r"\[\[[^]]+\]")
-    quoted_text_re = re.compile(r"''(.+?)''")
-    unwanted_re = re.compile(r"Ugh!|\(|\)")
-    quotes_re = re.compile(r"(?<!\w)'|'(?!\w)|^'|'$")
-    special_re = re.compile(
-        r"^(Say|Join|Follow|Play|Return|Make|Continue|Ignore|Embrace|Investigate|Go|Do|Drop|Tighten|Kneel|Force|Try)\s"
-    )
-
     choice = bullet_re.sub("", choice)
     choice = formatting_re.sub("", choice)
-    choice = prefixes_re.sub("", choice)
-    choice = actions_re.sub("", choice)
-    choice = unwanted_re.sub("", choice)
+    choice = markup_re.sub("", choice)
+    choice = choice.replace("Ugh!", "").translate(strip_parens)
     choice = quotes_re.sub("", choice)
 
     # quoted text is 100% spoken dialogue
@@ -56,17 +58,20 @@ def clean_choice_for_voice(choice: str) -> str | None:
     return rewrites.get(choice, choice) if choice else None
 
 
-def print_dialogue(item: Dialogue | Choice, offset: int | None = None):
+def format_dialogue(item: Dialogue | Choice, offset: int | None = None) -> str | None:
     characters = extract_characters()
     offset_text = f"[blue]{offset:+>2}[/] " if offset is not None else ""
 
     match item:
         case Dialogue(character=character, dialogue=dialogue):
-            rich.print(
-                f"{offset_text}[yellow]{characters[character]}[/]: [dim]{strip_formatting(dialogue)}"
-            )
+            return f"{offset_text}[yellow]{characters[character]}[/]: [dim]{strip_formatting(dialogue)}"
         case Choice(choice=choice):
-            rich.print(f"{offset_text}[red]Choice:[/] {strip_formatting(choice)}")
+            return f"{offset_text}[red]Choice:[/] {strip_formatting(choice)}"
+
+
+def print_dialogue(item: Dialogue | Choice, offset: int | None = None):
+    if text := format_dialogue(item, offset):
+        rich.print(text)
 
 
 def print_dialogues(items: list[Dialogue | Choice]):
@@ -75,16 +80,20 @@ def print_dialogues(items: list[Dialogue | Choice]):
 
 
 def print_choice_context(choice: ChoiceResult):
-    # Print dialogues before the choice with negative numbers
-    for i, dialogue in enumerate(choice.previous_dialogues[-3:]):
-        # Calculate relative position (-3, -2, or -1)
-        offset = i - len(choice.previous_dialogues[-3:])
-        print_dialogue(dialogue, offset)
+    # collect all lines first and render them in a single print call
+    lines = []
+
+    # Print dialogues before the choice with negative numbers (-3, -2, or -1)
+    before = choice.previous_dialogues[-3:]
+    for offset, dialogue in enumerate(before, -len(before)):
+        lines.append(format_dialogue(dialogue, offset))
 
     # Print the main choice at position 0
-    rich.print(f"[blue] 0[/] [bold magenta]Voiced: [bold blue]{choice.clean}")
-    rich.print(f"[blue] 0[/] [bold magenta]Choice:[/] [dim]{strip_formatting(choice.choice)}")
+    lines.append(f"[blue] 0[/] [bold magenta]Voiced: [bold blue]{choice.clean}")
+    lines.append(f"[blue] 0[/] [bold magenta]Choice:[/] [dim]{strip_formatting(choice.choice)}")
 
     # Print dialogues after the choice with positive numbers
     for i, dialogue in enumerate(choice.subsequent_dialogues[:3], 1):
-        print_dialogue(dialogue, i)
+        lines.append(format_dialogue(dialogue, i))
+
+    rich.print(Group(*(line for line in lines if line)))
@@ -3,41 +3,78 @@ Stage 4: Generate voices
 Clean up the choices we have extracted and generate voice files.
 """
 
+from __future__ import annotations
+
+import os
+from contextlib import suppress
 from functools import cache
+from hashlib import sha256
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import audiofile
-import audresample
-import mlx.core as mx
 import rich
-import sounddevice
 import typer
-from csm_mlx import CSM, Segment, csm_1b, generate
-from huggingface_hub import hf_hub_download
-from mlx_lm.sample_utils import make_sampler
-from mutagen.flac import FLAC
 
 from princess.choices import ChoiceResult
 from princess.game import get_game_path
 from princess.text import print_choice_context, strip_formatting
 
+# the audio and model stacks take seconds to import, only load them once we generate or play
+if TYPE_CHECKING:
+    from csm_mlx import Segment
+
 app = typer.Typer()
 target_sample_rate = 24_000
+SEGMENT_CACHE_DIR = Path("output/segments")
 
 
 @cache
 def load_model():
+    from csm_mlx import CSM, csm_1b
+    from huggingface_hub import hf_hub_download
+
     csm = CSM(csm_1b())
     weights = hf_hub_download(repo_id="senstella/csm-1b-mlx", filename="ckpt.safetensors")
     csm.load_weights(weights)
     return csm
 
 
+@cache
+def load_sampler():
+    from mlx_lm.sample_utils import make_sampler
+
+    return make_sampler(temp=0.9, top_k=50)
+
+
 def load_segment(audio: Path, text: str, speaker: int = 0) -> Segment:
-    data, sample_rate = audiofile.read(audio)
-    data = audresample.resample(data, sample_rate, target_sample_rate)
-    data = mx.array(data.squeeze())
-    return Segment(speaker=speaker, text=text, audio=data)
+    import audiofile
+    import audresample
+    import mlx.core as mx
+    import numpy as np
+    from csm_mlx import Segment
+
+    # decoding and resampling the same reference clips is redundant across runs, keep the result.
+    # size and mtime are part of the key so an updated clip at the same path is decoded again.
+    stat = audio.stat()
+    key = f"{audio}:{stat.st_size}:{stat.st_mtime_ns}:{target_sample_rate}"
+    cache_path = SEGMENT_CACHE_DIR / f"{audio.stem}-{sha256(key.encode()).hexdigest()[:16]}.npy"
+    try:
+        data = np.load(cache_path)
+    except (OSError, EOFError, ValueError):
+        # missing or corrupt entry, decode from the source clip
+        data, sample_rate = audiofile.read(audio)
+        data = audresample.resample(data, sample_rate, target_sample_rate).squeeze()
+        # write to a temporary name first so an interrupted save never leaves a broken entry
+        temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "wb") as f:
+                np.save(f, data)
+            temp_path.replace(cache_path)
+        except OSError:
+            with suppress(OSError):
+                temp_path.unlink(missing_ok=True)
+    return Segment(speaker=speaker, text=text, audio=mx.array(data))
 
 
 @cache
@@ -56,15 +93,18 @@ def load_hero_context():
 
 
 def sesame(text: str, context: list[Segment], output: Path, max_length: float = 10.0):
+    import audiofile
+    from csm_mlx import generate
+    from mutagen.flac import FLAC
+
     model = load_model()
-    sampler = make_sampler(temp=0.9, top_k=50)
     signal = generate(
         model=model,
         text=text,
         speaker=0,
         context=context,
         max_audio_length_ms=int(max_length * 1000),
-        sampler=sampler,
+        sampler=load_sampler(),
     )
     max_samples = max_length * target_sample_rate
     if len(signal) >= max_samples * 0.95:
@@ -79,6 +119,8 @@ def sesame(text: str, context: list[Segment], output: Path, max_length: float =
 
 
 def play_signal(signal):
+    import sounddevice
+
     sounddevice.play(signal, target_sample_rate)
     sounddevice.wait()
 
@@ -0,0 +1,15 @@
+from pathlib import Path
+
+import pytest
+
+from princess.parser import parse_script
+
+
+@pytest.fixture(scope="session")
+def micro_script_path():
+    return Path("tests/data/micro_script.rpy")
+
+
+@pytest.fixture(scope="session")
+def micro_script(micro_script_path):
+    return parse_script(micro_script_path, use_cache=False)
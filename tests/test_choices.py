@@ -1,20 +1,18 @@
-from pathlib import Path
-
 from princess.choices import ChoiceResult, extract_choices, get_voice_output_path
-from princess.parser import Choice, Dialogue, parse_script
+from princess.parser import Choice, Dialogue
 from princess.text import clean_choice_for_voice
 
-DIALOGUE = [
+DIALOGUE = (
     Dialogue(line=3, character="n", dialogue="narrator_line_1", voice="narrator_audio_1"),
     Dialogue(line=5, character="n", dialogue="narrator_line_2", voice="narrator_audio_2"),
     Dialogue(line=11, character="n", dialogue="narrator_line_3", voice="narrator_audio_3"),
     Dialogue(line=15, character="n", dialogue="narrator_line_4", voice="narrator_audio_4"),
     Dialogue(line=19, character="n", dialogue="narrator_line_5", voice="narrator_audio_5"),
     Dialogue(line=22, character="n", dialogue="narrator_line_6", voice="narrator_audio_6"),
-]
-CHOSEN = [
-    Choice(line=12, choice="• choice_3", condition="condition_3 == False", children=[]),
-]
+)
+CHOSEN = (Choice(line=12, choice="• choice_3", condition="condition_3 == False", children=[]),)
+PREVIOUS_MAIN = (DIALOGUE[0], DIALOGUE[1])
+PREVIOUS_NESTED = (*PREVIOUS_MAIN, CHOSEN[0], DIALOGUE[3])
 
 
 def create_choice_result(line, label, choice, condition, previous, subsequent, path):
@@ -33,13 +31,13 @@ def create_choice_result(line, label, choice, condition, previous, subsequent, p
     )
 
 
-CHOICES = [
+CHOICES = (
     create_choice_result(
         line=8,
         label="main_dialogue",
         choice="• choice_1",
         condition="condition_1 == False",
-        previous=[DIALOGUE[0], DIALOGUE[1]],
+        previous=PREVIOUS_MAIN,
         subsequent=[],
         path="tests/data/micro_script.rpy",
     ),
@@ -48,7 +46,7 @@ CHOICES = [
         label="main_dialogue",
         choice="• choice_2",
         condition="condition_2 == False",
-        previous=[DIALOGUE[0], DIALOGUE[1]],
+        previous=PREVIOUS_MAIN,
         subsequent=[DIALOGUE[2]],
         path="tests/data/micro_script.rpy",
     ),
@@ -57,7 +55,7 @@ CHOICES = [
         label="main_dialogue",
         choice="• choice_3",
         condition="condition_3 == False",
-        previous=[DIALOGUE[0], DIALOGUE[1]],
+        previous=PREVIOUS_MAIN,
         subsequent=[DIALOGUE[3]],
         path="tests/data/micro_script.rpy",
     ),
@@ -66,7 +64,7 @@ CHOICES = [
         label="nested_sequence",
         choice="• nested_choice_1",
         condition="can_proceed",
-        previous=[DIALOGUE[0], DIALOGUE[1], CHOSEN[0], DIALOGUE[3]],
+        previous=PREVIOUS_NESTED,
         subsequent=[DIALOGUE[4]],
         path="tests/data/micro_script.rpy",
     ),
@@ -75,7 +73,7 @@ CHOICES = [
         label="nested_sequence",
         choice="• nested_choice_2",
         condition=None,
-        previous=[DIALOGUE[0], DIALOGUE[1], CHOSEN[0], DIALOGUE[3]],
+        previous=PREVIOUS_NESTED,
         subsequent=[DIALOGUE[5]],
         path="tests/data/micro_script.rpy",
     ),
@@ -84,19 +82,14 @@ CHOICES = [
         label="nested_sequence",
         choice="• nested_choice_3",
         condition=None,
-        previous=[DIALOGUE[0], DIALOGUE[1], CHOSEN[0], DIALOGUE[3]],
+        previous=PREVIOUS_NESTED,
         subsequent=[],
         path="tests/data/micro_script.rpy",
     ),
-]
+)
 
 
-def test_parse_full_match():
-    script_path = Path("tests/data/micro_script.rpy")
-    ast_tree = parse_script(script_path)
-    parsed = extract_choices(ast_tree, script_path)
+def test_parse_full_match(micro_script, micro_script_path):
+    parsed = extract_choices(micro_script, micro_script_path)
 
-    # Check that each parsed result matches the expected format/structure
-    for i, result in enumerate(parsed):
-        expected = CHOICES[i]
-        assert expected == result
+    assert tuple(parsed) == CHOICES
@@ -0,0 +1,37 @@
+import pytest
+
+from princess import parser
+from princess.parser import parse_script
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    def use(path):
+        monkeypatch.setattr(parser, "PARSE_CACHE_DIR", path)
+        parser.parse_cache_dir.cache_clear()
+
+    yield use
+    # don't leave the cached cache dir pointing into tmp_path for later tests
+    parser.parse_cache_dir.cache_clear()
+
+
+def test_parse_cache_unusable_dir(tmp_path, cache_dir, micro_script_path):
+    expected = parse_script(micro_script_path, use_cache=False)
+
+    # a file where the cache dir should be, reads and writes both fail
+    (tmp_path / "output").write_text("")
+    cache_dir(tmp_path / "output/cache/ast")
+    assert parse_script(micro_script_path) == expected
+
+
+def test_parse_cache_truncated_entry(tmp_path, cache_dir, micro_script_path):
+    expected = parse_script(micro_script_path, use_cache=False)
+
+    cache_dir(tmp_path / "cache")
+    assert parse_script(micro_script_path) == expected
+    (entry,) = parser.parse_cache_dir().glob("*.pickle")
+
+    # a truncated entry is parsed again and replaced
+    entry.write_bytes(entry.read_bytes()[:10])
+    assert parse_script(micro_script_path) == expected
+    assert parse_script(micro_script_path) == expected
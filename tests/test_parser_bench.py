@@ -0,0 +1,14 @@
+from princess.game import walk_script_files
+from princess.parser import parse_source
+
+# skipped by default through addopts, run with `pytest --benchmark-only`
+# and add `--benchmark-compare-fail=mean:10%` against a saved run to catch regressions
+
+
+def test_parse_micro_script_bench(benchmark, micro_script_path):
+    benchmark(parse_source, micro_script_path.read_text())
+
+
+def test_parse_largest_script_bench(benchmark):
+    largest = max(walk_script_files(), key=lambda path: path.stat().st_size)
+    benchmark(parse_source, largest.read_text())